@@ -35,15 +35,11 @@ create_repo() {
     
     echo -e "\n${YELLOW}Creating ${repo_name}...${NC}"
     
-    # Check if repo exists
-    if curl -s -H "Authorization: token ${GITHUB_TOKEN}" \
-        "https://api.github.com/repos/${GITHUB_ORG}/${repo_name}" | grep -q "\"name\":"; then
-        echo -e "${YELLOW}Repository ${repo_name} already exists, skipping...${NC}"
-        return 0
-    fi
-    
-    # Create the repository
+    # Create the repository; an existing repository is reported as a 422,
+    # which saves a separate existence check per repository
     response=$(curl -s -X POST \
+        --retry 3 --retry-delay 2 \
+        -w "\n%{http_code}" \
         -H "Authorization: token ${GITHUB_TOKEN}" \
         -H "Accept: application/vnd.github.v3+json" \
         "https://api.github.com/orgs/${GITHUB_ORG}/repos" \
@@ -60,10 +56,23 @@ create_repo() {
             \"allow_rebase_merge\": true,
             \"delete_branch_on_merge\": true
         }")
+    status=$(tail -n 1 <<< "$response")
+    response=$(sed '$d' <<< "$response")
     
-    if echo "$response" | grep -q "\"name\": \"${repo_name}\""; then
+    if [ "$status" = "201" ]; then
         echo -e "${GREEN}✓ Created ${repo_name}${NC}"
         return 0
+    elif [ "$status" = "422" ] && echo "$response" | grep -q "already exists"; then
+        echo -e "${YELLOW}Repository ${repo_name} already exists, skipping...${NC}"
+        return 0
+    elif { [ "$status" = "403" ] || [ "$status" = "404" ]; } && \
+        curl -s --retry 3 --retry-delay 2 \
+            -H "Authorization: token ${GITHUB_TOKEN}" \
+            "https://api.github.com/repos/${GITHUB_ORG}/${repo_name}" | grep -q "\"name\":"; then
+        # Tokens without repo-create rights can still re-run the script as
+        # long as they can read the repositories that already exist
+        echo -e "${YELLOW}Repository ${repo_name} already exists, skipping...${NC}"
+        return 0
     else
         echo -e "${RED}✗ Failed to create ${repo_name}${NC}"
         echo "$response"
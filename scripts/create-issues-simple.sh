@@ -6,268 +6,389 @@ set -e
 
 # Colors
 GREEN='\033[0;32m'
+RED='\033[0;31m'
 YELLOW='\033[1;33m'
 BLUE='\033[0;34m'
 NC='\033[0m'
 
 GITHUB_ORG="Plasma-Engine"
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ISSUES_FILE="${SCRIPT_DIR}/data/phase1-issues.json"
+BATCH_SIZE=20  # createIssue mutations aliased into a single GraphQL request
+MAX_ATTEMPTS=5 # attempts per request when GitHub's secondary rate limit trips
+CREATE_DELAY=1 # seconds between content-creating requests, which GitHub wants serial
+
+# Issues are queued here and flushed per repository in batched mutations
+CREATE_SENT=false
+QUEUE_REPOS=()
+QUEUE_TITLES=()
+QUEUE_BODIES=()
+QUEUE_LABELS=()
+
+DRY_RUN=false
+
+# Handle options before any data is loaded or GitHub is contacted
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --dry-run)
+            DRY_RUN=true
+            ;;
+        -h|--help)
+            echo "Usage: $(basename "$0") [--dry-run]"
+            echo ""
+            echo "Create the Phase 1 issues defined in ${ISSUES_FILE}."
+            echo ""
+            echo "  --dry-run   Validate the issue data and report what would be created"
+            exit 0
+            ;;
+        *)
+            echo "Unknown option: $1 (see --help)"
+            exit 1
+            ;;
+    esac
+    shift
+done
 
 echo -e "${BLUE}Creating Phase 1 Issues for Plasma Engine${NC}"
 
-# Function to create issue
+if ! command -v jq &> /dev/null; then
+    echo -e "${YELLOW}jq is required to read ${ISSUES_FILE}. Install with: brew install jq${NC}"
+    exit 1
+fi
+
+# Function to compose the standard issue body from its unique parts
+# Arguments: summary, priority, sprint, then one argument per task
+issue_body() {
+    local summary=$1
+    local priority=$2
+    local sprint=$3
+    shift 3
+    
+    printf '%s\n\nPriority: %s\nSprint: %s\n\nTasks:\n' "$summary" "$priority" "$sprint"
+    printf -- '- %s\n' "$@"
+}
+
+# Function to queue an issue for creation
 create_issue() {
     local repo=$1
     local title=$2
     local body=$3
     local labels=$4
     
-    echo -e "${YELLOW}Creating: ${title}${NC}"
-    
-    gh issue create \
-        --repo "${GITHUB_ORG}/${repo}" \
-        --title "${title}" \
-        --body "${body}" \
-        --label "${labels}" 2>/dev/null && \
-        echo -e "${GREEN}✓ Created${NC}" || \
-        echo -e "  Issue might already exist"
+    QUEUE_REPOS+=("$repo")
+    QUEUE_TITLES+=("$title")
+    QUEUE_BODIES+=("$body")
+    QUEUE_LABELS+=("$labels")
 }
 
-# Gateway Issues
-echo -e "\n${BLUE}Gateway Service Issues:${NC}"
-create_issue "plasma-engine-gateway" \
-    "[PE-GW-001] Set up FastAPI application structure" \
-    "Initialize FastAPI application with proper project structure, dependency injection, and configuration management.
-    
-Priority: High
-Sprint: 1
-    
-Tasks:
-- Set up FastAPI project structure
-- Configure dependency injection
-- Implement configuration management
-- Set up logging
-- Create health check endpoints" \
-    "type:feature,priority:high,service:gateway"
-
-create_issue "plasma-engine-gateway" \
-    "[PE-GW-002] Implement JWT authentication" \
-    "Implement JWT-based authentication with refresh tokens and role-based access control.
-    
-Priority: Critical
-Sprint: 1
-    
-Tasks:
-- Implement JWT token generation
-- Create refresh token mechanism
-- Add role-based access control
-- Implement token validation middleware
-- Create user authentication endpoints" \
-    "type:feature,priority:critical,service:gateway"
-
-create_issue "plasma-engine-gateway" \
-    "[PE-GW-003] GraphQL Federation setup" \
-    "Set up Apollo Federation for GraphQL schema composition across services.
-    
-Priority: High
-Sprint: 2
-    
-Tasks:
-- Install and configure Apollo Federation
-- Create base GraphQL schema
-- Implement schema composition
-- Set up GraphQL playground
-- Add query complexity analysis" \
-    "type:feature,priority:high,service:gateway"
+# Function to run a gh command, backing off with jitter on secondary rate limits
+# ("was submitted too quickly"); other failures are returned immediately
+gh_retry() {
+    local attempt=1
+    local delay=2
+    local errors output
+    
+    errors=$(mktemp)
+    while true; do
+        if output=$(gh "$@" 2>"$errors"); then
+            rm -f "$errors"
+            [ -z "$output" ] || echo "$output"
+            return 0
+        fi
+        
+        if [ "$attempt" -ge "$MAX_ATTEMPTS" ] || \
+            ! grep -qiE 'submitted too quickly|secondary rate limit|abuse' "$errors"; then
+            cat "$errors" >&2
+            rm -f "$errors"
+            return 1
+        fi
+        
+        sleep $((delay + RANDOM % delay))
+        attempt=$((attempt + 1))
+        delay=$((delay * 2))
+    done
+}
 
-# Research Issues
-echo -e "\n${BLUE}Research Service Issues:${NC}"
-create_issue "plasma-engine-research" \
-    "[PE-RS-001] GraphRAG core implementation" \
-    "Implement core GraphRAG functionality with Neo4j and vector embeddings.
-    
-Priority: Critical
-Sprint: 1
-    
-Tasks:
-- Set up Neo4j connection
-- Implement graph schema
-- Create embedding generation
-- Build graph construction logic
-- Implement retrieval algorithms" \
-    "type:feature,priority:critical,service:research,ai:graphrag"
+# Function to validate every issue in the data file with a single jq pass
+validate_issues() {
+    local file=$1
+    local invalid
+    
+    invalid=$(jq -r 'to_entries[] | .key as $i | .value
+        | select(
+            ([.repo, .title, .summary] | all(type == "string" and length > 0) | not)
+            or (.priority | IN("Critical", "High", "Medium", "Low") | not)
+            or (.sprint | type != "number")
+            or (.tasks | type != "array" or length == 0)
+            or (.labels | type != "array" or length == 0)
+        )
+        | "  #\($i): \(if (.title | type) == "string" and (.title | length) > 0 then .title else "(untitled)" end)"' "$file") || return 1
+    
+    if [ -n "$invalid" ]; then
+        echo -e "${YELLOW}Invalid issue definitions in ${file}:${NC}"
+        echo "$invalid"
+        return 1
+    fi
+}
 
-create_issue "plasma-engine-research" \
-    "[PE-RS-002] Multi-source search orchestration" \
-    "Implement parallel search across multiple data sources with result aggregation.
-    
-Priority: High
-Sprint: 1
-    
-Tasks:
-- Create search interface abstraction
-- Implement parallel search execution
-- Build result ranking algorithm
-- Add caching layer
-- Create search API endpoints" \
-    "type:feature,priority:high,service:research"
+# Function to queue every issue in a JSON data file
+# jq emits NUL-separated fields so bodies and titles need no escaping
+load_issues() {
+    local file=$1
+    local repo title summary priority sprint tasks labels task
+    local task_args
+    
+    while IFS= read -r -d '' repo &&
+        IFS= read -r -d '' title &&
+        IFS= read -r -d '' summary &&
+        IFS= read -r -d '' priority &&
+        IFS= read -r -d '' sprint &&
+        IFS= read -r -d '' tasks &&
+        IFS= read -r -d '' labels; do
+        task_args=()
+        while IFS= read -r task; do
+            task_args+=("$task")
+        done <<< "$tasks"
+        
+        create_issue "$repo" "$title" \
+            "$(issue_body "$summary" "$priority" "$sprint" "${task_args[@]}")" \
+            "$labels"
+    done < <(jq -j '.[] | .repo, "\u0000", .title, "\u0000", .summary, "\u0000",
+        .priority, "\u0000", (.sprint | tostring), "\u0000",
+        (.tasks | join("\n")), "\u0000", (.labels | join(",")), "\u0000"' "$file")
+}
 
-create_issue "plasma-engine-research" \
-    "[PE-RS-003] Knowledge ingestion pipeline" \
-    "Build pipeline for ingesting and processing documents into knowledge graph.
-    
-Priority: High
-Sprint: 2
-    
-Tasks:
-- Create document parsers
-- Implement chunking strategies
-- Build entity extraction
-- Create relationship mapping
-- Add incremental update support" \
-    "type:feature,priority:high,service:research,ai:graphrag"
+# Function to space content-creating requests CREATE_DELAY seconds apart
+pace_create() {
+    if [ "$CREATE_SENT" = true ]; then
+        sleep "$CREATE_DELAY"
+    fi
+    CREATE_SENT=true
+}
 
-# Brand Issues
-echo -e "\n${BLUE}Brand Service Issues:${NC}"
-create_issue "plasma-engine-brand" \
-    "[PE-BR-001] Social media monitoring setup" \
-    "Implement monitoring for Twitter, LinkedIn, Reddit, and other platforms.
-    
-Priority: High
-Sprint: 1
-    
-Tasks:
-- Set up API connections
-- Create data collection workers
-- Implement rate limiting
-- Build data normalization
-- Create monitoring dashboard" \
-    "type:feature,priority:high,service:brand"
+# Function to create a single issue through the REST API (used when GraphQL is unavailable)
+create_issue_rest() {
+    local repo=$1
+    local title=$2
+    local body=$3
+    local labels=$4
+    local label_args=()
+    local label_names label url
+    
+    IFS=',' read -ra label_names <<< "$labels"
+    for label in "${label_names[@]}"; do
+        label_args+=(-f "labels[]=${label}")
+    done
+    
+    if url=$(gh_retry api \
+        --method POST \
+        -H "Accept: application/vnd.github+json" \
+        "/repos/${GITHUB_ORG}/${repo}/issues" \
+        -f title="${title}" \
+        -f body="${body}" \
+        "${label_args[@]}" \
+        --jq '.html_url' 2>/dev/null); then
+        echo -e "${GREEN}✓ Created${NC} ${url}"
+    else
+        echo -e "  Issue might already exist: ${title}"
+    fi
+}
 
-create_issue "plasma-engine-brand" \
-    "[PE-BR-002] Sentiment analysis engine" \
-    "Implement real-time sentiment analysis for brand mentions.
-    
-Priority: Medium
-Sprint: 2
-    
-Tasks:
-- Integrate sentiment analysis models
-- Create analysis pipeline
-- Build confidence scoring
-- Implement trend detection
-- Add alerting system" \
-    "type:feature,priority:medium,service:brand,ai:llm"
+# Function to resolve the repository ID and label IDs with one GraphQL query
+# Sets REPO_ID and LABEL_IDS (one "name<TAB>id" pair per line)
+resolve_repo_ids() {
+    local repo=$1
+    local resolved
+    
+    resolved=$(gh_retry api graphql \
+        -f owner="${GITHUB_ORG}" \
+        -f name="${repo}" \
+        -f query='query($owner: String!, $name: String!) {
+            repository(owner: $owner, name: $name) {
+                id
+                labels(first: 100) { nodes { id name } }
+            }
+        }' \
+        --jq '.data.repository | .id, (.labels.nodes[] | "\(.name)\t\(.id)")' 2>/dev/null) || return 1
+    
+    REPO_ID=$(head -n 1 <<< "$resolved")
+    LABEL_IDS=$(tail -n +2 <<< "$resolved")
+    LABEL_SET_KEYS=()
+    LABEL_SET_VALUES=()
+    [ -n "$REPO_ID" ]
+}
 
-# Content Issues
-echo -e "\n${BLUE}Content Service Issues:${NC}"
-create_issue "plasma-engine-content" \
-    "[PE-CT-001] AI content generation pipeline" \
-    "Build content generation pipeline with multiple LLM providers.
-    
-Priority: High
-Sprint: 1
-    
-Tasks:
-- Integrate AI SDK
-- Create content templates
-- Implement generation workflow
-- Add quality scoring
-- Build content versioning" \
-    "type:feature,priority:high,service:content,ai:llm"
+# Function to map comma-separated label names to a GraphQL ID list
+# Sets LABEL_ID_LIST; issues share a handful of label sets, so each distinct
+# set is resolved once per repository and reused
+label_id_list() {
+    local labels=$1
+    local ids=""
+    local i wanted label name id found
+    
+    for i in "${!LABEL_SET_KEYS[@]}"; do
+        if [ "${LABEL_SET_KEYS[$i]}" = "$labels" ]; then
+            LABEL_ID_LIST=${LABEL_SET_VALUES[$i]}
+            return
+        fi
+    done
+    
+    IFS=',' read -ra wanted <<< "$labels"
+    for label in "${wanted[@]}"; do
+        found=""
+        while IFS=$'\t' read -r name id; do
+            if [ "$name" = "$label" ]; then
+                found=$id
+                break
+            fi
+        done <<< "$LABEL_IDS"
+        
+        if [ -n "$found" ]; then
+            ids="${ids:+${ids}, }\"${found}\""
+        else
+            echo -e "  ${YELLOW}Label '${label}' not found, skipping${NC}" >&2
+        fi
+    done
+    
+    LABEL_SET_KEYS+=("$labels")
+    LABEL_SET_VALUES+=("$ids")
+    LABEL_ID_LIST=$ids
+}
 
-create_issue "plasma-engine-content" \
-    "[PE-CT-002] Multi-platform publishing" \
-    "Implement publishing to various platforms (blog, social, email).
-    
-Priority: Medium
-Sprint: 2
-    
-Tasks:
-- Create publishing adapters
-- Implement scheduling system
-- Build platform-specific formatting
-- Add publishing analytics
-- Create rollback mechanism" \
-    "type:feature,priority:medium,service:content"
+# Function to submit one request of aliased createIssue mutations
+# Arguments: queue indices of the issues in the batch
+# Sets BATCH_FAILED to the queue indices whose createIssue returned no issue
+# and BATCH_ERRORS to gh's error output
+submit_batch() {
+    local indices=("$@")
+    local declarations=""
+    local selections=""
+    local vars=()
+    local urls=()
+    local count=0
+    local errors response url i
+    
+    for i in "${indices[@]}"; do
+        label_id_list "${QUEUE_LABELS[$i]}"
+        declarations="${declarations}, \$t${count}: String!, \$b${count}: String!"
+        selections="${selections}
+    i${count}: createIssue(input: {repositoryId: \$repo, title: \$t${count}, body: \$b${count}, labelIds: [${LABEL_ID_LIST}]}) { issue { url } }"
+        vars+=(-f "t${count}=${QUEUE_TITLES[$i]}" -f "b${count}=${QUEUE_BODIES[$i]}")
+        count=$((count + 1))
+    done
+    
+    # gh exits non-zero when any alias fails, but the response body still
+    # carries the issues that were created, so parse it either way
+    errors=$(mktemp)
+    pace_create
+    response=$(gh api graphql \
+        -f repo="${REPO_ID}" \
+        -f query="mutation(\$repo: ID!${declarations}) {${selections} }" \
+        "${vars[@]}" 2>"$errors") || true
+    
+    while IFS= read -r url; do
+        urls+=("$url")
+    done < <(jq -r --argjson n "$count" \
+        '. as $response | range($n) | ($response.data["i\(.)"].issue.url? // "")' \
+        <<< "$response" 2>/dev/null || true)
+    
+    BATCH_FAILED=()
+    count=0
+    for i in "${indices[@]}"; do
+        url=${urls[$count]}
+        if [ -n "$url" ]; then
+            echo -e "${GREEN}✓ Created${NC} ${url}"
+        else
+            BATCH_FAILED+=("$i")
+        fi
+        count=$((count + 1))
+    done
+    
+    BATCH_ERRORS=$(cat "$errors")
+    rm -f "$errors"
+}
 
-# Agent Issues
-echo -e "\n${BLUE}Agent Service Issues:${NC}"
-create_issue "plasma-engine-agent" \
-    "[PE-AG-001] MCP server integration" \
-    "Integrate Model Context Protocol for agent communication.
-    
-Priority: Critical
-Sprint: 1
-    
-Tasks:
-- Set up MCP server
-- Implement tool registry
-- Create agent communication protocol
-- Build context management
-- Add agent orchestration" \
-    "type:feature,priority:critical,service:agent"
+# Function to create a batch of issues, retrying only the aliases that failed
+# when GitHub's secondary rate limit trips; created aliases are never resent
+# Arguments: queue indices of the issues in the batch
+send_batch() {
+    local pending=("$@")
+    local attempt=1
+    local delay=2
+    local i
+    
+    while true; do
+        submit_batch "${pending[@]}"
+        [ "${#BATCH_FAILED[@]}" -gt 0 ] || return 0
+        
+        if [ "$attempt" -ge "$MAX_ATTEMPTS" ] || \
+            ! grep -qiE 'submitted too quickly|secondary rate limit|abuse' <<< "$BATCH_ERRORS"; then
+            break
+        fi
+        
+        echo -e "  ${YELLOW}Rate limited, retrying ${#BATCH_FAILED[@]} failed issue(s) after backing off${NC}"
+        sleep $((delay + RANDOM % delay))
+        pending=("${BATCH_FAILED[@]}")
+        attempt=$((attempt + 1))
+        delay=$((delay * 2))
+    done
+    
+    [ -n "$BATCH_ERRORS" ] && sed 's/^/    /' <<< "$BATCH_ERRORS"
+    for i in "${BATCH_FAILED[@]}"; do
+        echo -e "${RED}✗ Failed to create:${NC} ${QUEUE_TITLES[$i]}"
+    done
+}
 
-create_issue "plasma-engine-agent" \
-    "[PE-AG-002] Browser automation framework" \
-    "Implement Playwright-based browser automation for web interactions.
-    
-Priority: High
-Sprint: 2
-    
-Tasks:
-- Set up Playwright
-- Create action abstractions
-- Implement session management
-- Build error recovery
-- Add screenshot capabilities" \
-    "type:feature,priority:high,service:agent"
+# Function to create all queued issues for a repository in batched GraphQL requests
+flush_issues() {
+    local repo=$1
+    local batch=()
+    local i
+    
+    echo -e "\n${BLUE}${repo}:${NC}"
+    if ! resolve_repo_ids "$repo"; then
+        echo -e "  ${YELLOW}GraphQL lookup failed for ${repo}, falling back to the REST API${NC}"
+        for i in "${!QUEUE_REPOS[@]}"; do
+            [ "${QUEUE_REPOS[$i]}" = "$repo" ] || continue
+            echo -e "${YELLOW}Creating: ${QUEUE_TITLES[$i]}${NC}"
+            pace_create
+            create_issue_rest "$repo" "${QUEUE_TITLES[$i]}" "${QUEUE_BODIES[$i]}" "${QUEUE_LABELS[$i]}"
+        done
+        return
+    fi
+    
+    for i in "${!QUEUE_REPOS[@]}"; do
+        [ "${QUEUE_REPOS[$i]}" = "$repo" ] || continue
+        
+        echo -e "${YELLOW}Creating: ${QUEUE_TITLES[$i]}${NC}"
+        batch+=("$i")
+        
+        if [ "${#batch[@]}" -eq "$BATCH_SIZE" ]; then
+            send_batch "${batch[@]}"
+            batch=()
+        fi
+    done
+    
+    if [ "${#batch[@]}" -gt 0 ]; then
+        send_batch "${batch[@]}"
+    fi
+}
 
-# Infrastructure Issues
-echo -e "\n${BLUE}Infrastructure Issues:${NC}"
-create_issue "plasma-engine-infra" \
-    "[PE-INF-001] Kubernetes manifests" \
-    "Create Kubernetes deployment manifests for all services.
-    
-Priority: High
-Sprint: 1
-    
-Tasks:
-- Create deployment manifests
-- Set up ConfigMaps
-- Configure Secrets
-- Create Services
-- Add Ingress rules" \
-    "type:infrastructure,priority:high"
+# Queue issues from the data file in a single jq pass
+echo -e "\n${BLUE}Loading issues from ${ISSUES_FILE}${NC}"
+validate_issues "$ISSUES_FILE" || exit 1
+load_issues "$ISSUES_FILE"
 
-create_issue "plasma-engine-infra" \
-    "[PE-INF-002] Terraform infrastructure" \
-    "Set up Terraform for cloud infrastructure provisioning.
-    
-Priority: High
-Sprint: 1
-    
-Tasks:
-- Create Terraform modules
-- Set up state management
-- Configure providers
-- Create environment configs
-- Add resource tagging" \
-    "type:infrastructure,priority:high"
+if [ "$DRY_RUN" = true ]; then
+    echo -e "\n${GREEN}Dry run: would create ${#QUEUE_TITLES[@]} issues across $(printf '%s\n' "${QUEUE_REPOS[@]}" | sort -u | wc -l | tr -d ' ') repositories${NC}"
+    exit 0
+fi
 
-create_issue "plasma-engine-infra" \
-    "[PE-INF-003] Monitoring stack" \
-    "Deploy Prometheus, Grafana, and Loki for observability.
-    
-Priority: Medium
-Sprint: 2
-    
-Tasks:
-- Deploy Prometheus
-- Configure Grafana dashboards
-- Set up Loki for logs
-- Create alerting rules
-- Add service monitors" \
-    "type:infrastructure,priority:medium"
+# Create queued issues, one batched GraphQL request per repository
+echo -e "\n${BLUE}Submitting issues:${NC}"
+for repo in $(printf '%s\n' "${QUEUE_REPOS[@]}" | awk '!seen[$0]++'); do
+    flush_issues "$repo"
+done
 
 echo -e "\n${GREEN}✅ Issue creation complete!${NC}"
 echo -e "${BLUE}View all issues at: https://github.com/issues?q=org%3APlasma-Engine+is%3Aopen${NC}"
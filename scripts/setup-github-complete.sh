@@ -21,55 +21,144 @@ NC='\033[0m'
 # Configuration
 GITHUB_ORG="Plasma-Engine"
 BASE_DIR="/Users/a004/Library/Mobile Documents/com~apple~CloudDocs/Documents/CODE_PROJECTS/plasma-engine-org"
+CACHE_DIR="${BASE_DIR}/.cache"
+MAX_JOBS=8      # repositories configured concurrently (read-only and settings calls)
+MAX_ATTEMPTS=5  # attempts per request when GitHub's secondary rate limit trips
+CREATE_DELAY=1  # seconds between content-creating requests, which GitHub wants serial
+CREATE_SENT=false
 
 echo -e "${BLUE}═══════════════════════════════════════════════════════${NC}"
 echo -e "${BLUE}🚀 Complete Plasma Engine GitHub Setup${NC}"
 echo -e "${BLUE}═══════════════════════════════════════════════════════${NC}"
 
+if ! command -v jq &> /dev/null; then
+    echo -e "${RED}jq is required to read GitHub responses. Install with: brew install jq${NC}"
+    exit 1
+fi
+
 # Function to create labels for a repository
 create_labels() {
     local repo=$1
     echo -e "\n${YELLOW}Creating labels for ${repo}...${NC}"
     
-    # Define standard labels with colors
+    # Define standard labels as name|color|description
     declare -a labels=(
-        "priority:critical:b60205:Issues that need immediate attention"
-        "priority:high:d73a4a:High priority issues"
-        "priority:medium:fbca04:Medium priority issues"
-        "priority:low:0e8a16:Low priority issues"
-        "type:bug:d73a4a:Something isn't working"
-        "type:feature:a2eeef:New feature or request"
-        "type:enhancement:84b6eb:Improvement to existing functionality"
-        "type:documentation:0075ca:Improvements or additions to documentation"
-        "type:infrastructure:c5def5:Infrastructure and DevOps related"
-        "type:security:d73a4a:Security related issues"
-        "status:in-progress:fbca04:Work in progress"
-        "status:blocked:b60205:Blocked by another issue"
-        "status:review:7057ff:Ready for review"
-        "service:gateway:1d76db:Gateway service related"
-        "service:research:1d76db:Research service related"
-        "service:brand:1d76db:Brand service related"
-        "service:content:1d76db:Content service related"
-        "service:agent:1d76db:Agent service related"
-        "phase:1:c2e0c6:Phase 1 implementation"
-        "phase:2:c2e0c6:Phase 2 implementation"
-        "ai:llm:ff6b6b:LLM/AI related"
-        "ai:graphrag:ff6b6b:GraphRAG related"
+        "priority:critical|b60205|Issues that need immediate attention"
+        "priority:high|d73a4a|High priority issues"
+        "priority:medium|fbca04|Medium priority issues"
+        "priority:low|0e8a16|Low priority issues"
+        "type:bug|d73a4a|Something isn't working"
+        "type:feature|a2eeef|New feature or request"
+        "type:enhancement|84b6eb|Improvement to existing functionality"
+        "type:documentation|0075ca|Improvements or additions to documentation"
+        "type:infrastructure|c5def5|Infrastructure and DevOps related"
+        "type:security|d73a4a|Security related issues"
+        "status:in-progress|fbca04|Work in progress"
+        "status:blocked|b60205|Blocked by another issue"
+        "status:review|7057ff|Ready for review"
+        "service:gateway|1d76db|Gateway service related"
+        "service:research|1d76db|Research service related"
+        "service:brand|1d76db|Brand service related"
+        "service:content|1d76db|Content service related"
+        "service:agent|1d76db|Agent service related"
+        "phase:1|c2e0c6|Phase 1 implementation"
+        "phase:2|c2e0c6|Phase 2 implementation"
+        "ai:llm|ff6b6b|LLM/AI related"
+        "ai:graphrag|ff6b6b|GraphRAG related"
     )
     
+    # Fetch the repository ID and existing label names in one query
+    local lookup repo_id existing
+    lookup=$(gh api graphql \
+        -f owner="${GITHUB_ORG}" \
+        -f name="${repo}" \
+        -f query='query($owner: String!, $name: String!) {
+            repository(owner: $owner, name: $name) {
+                id
+                labels(first: 100) { nodes { name } }
+            }
+        }' \
+        --jq '.data.repository | .id, .labels.nodes[].name' 2>/dev/null || true)
+    repo_id=$(head -n 1 <<< "$lookup")
+    existing=$(tail -n +2 <<< "$lookup")
+    
+    # Queue missing labels as aliased createLabel mutations
+    local declarations=""
+    local selections=""
+    local vars=()
+    local missing=()
+    local count=0
+    local created errors
+    
     for label_info in "${labels[@]}"; do
-        IFS=':' read -r name color description <<< "$label_info"
+        IFS='|' read -r name color description <<< "$label_info"
         
         # Check if label exists
-        if gh label list -R "${GITHUB_ORG}/${repo}" | grep -q "^${name}"; then
+        if [[ $'\n'"${existing}"$'\n' == *$'\n'"${name}"$'\n'* ]]; then
             echo "  Label '${name}' already exists"
         else
-            gh label create "${name}" \
-                --color "${color}" \
-                --description "${description}" \
-                -R "${GITHUB_ORG}/${repo}" 2>/dev/null && \
-                echo -e "  ${GREEN}✓${NC} Created label: ${name}" || \
-                echo -e "  ${YELLOW}⚠${NC} Could not create label: ${name}"
+            missing+=("$label_info")
+            declarations="${declarations}, \$n${count}: String!, \$c${count}: String!, \$d${count}: String"
+            selections="${selections}
+    l${count}: createLabel(input: {repositoryId: \$repo, name: \$n${count}, color: \$c${count}, description: \$d${count}}) { label { name } }"
+            vars+=(-f "n${count}=${name}" -f "c${count}=${color}" -f "d${count}=${description}")
+            count=$((count + 1))
+        fi
+    done
+    
+    [ "$count" -gt 0 ] || return 0
+    
+    # Create all missing labels in a single request
+    # (createLabel still requires the bane preview media type)
+    # gh exits non-zero when any alias fails, but the response body still
+    # carries the labels that were created, so parse it either way
+    local response results=() failed=()
+    errors=$(mktemp)
+    if [ -n "$repo_id" ]; then
+        pace_create
+        response=$(gh api graphql \
+            -H "Accept: application/vnd.github.bane-preview+json" \
+            -f repo="${repo_id}" \
+            -f query="mutation(\$repo: ID!${declarations}) {${selections} }" \
+            "${vars[@]}" 2>"$errors") || true
+        
+        while IFS= read -r created; do
+            results+=("$created")
+        done < <(jq -r --argjson n "$count" \
+            '. as $response | range($n) | ($response.data["l\(.)"].label.name? // "")' \
+            <<< "$response" 2>/dev/null || true)
+    fi
+    
+    count=0
+    for label_info in "${missing[@]}"; do
+        IFS='|' read -r name color description <<< "$label_info"
+        if [ -n "${results[$count]}" ]; then
+            echo -e "  ${GREEN}✓${NC} Created label: ${name}"
+        else
+            failed+=("$label_info")
+        fi
+        count=$((count + 1))
+    done
+    
+    if [ "${#failed[@]}" -eq 0 ]; then
+        rm -f "$errors"
+        return 0
+    fi
+    
+    echo -e "  ${YELLOW}⚠${NC} Batch creation failed for ${#failed[@]} label(s), creating them individually"
+    [ -s "$errors" ] && sed 's/^/    /' "$errors"
+    rm -f "$errors"
+    
+    for label_info in "${failed[@]}"; do
+        IFS='|' read -r name color description <<< "$label_info"
+        pace_create
+        if errors=$(gh_retry label create "${name}" \
+            --color "${color}" \
+            --description "${description}" \
+            -R "${GITHUB_ORG}/${repo}" 2>&1); then
+            echo -e "  ${GREEN}✓${NC} Created label: ${name}"
+        else
+            echo -e "  ${YELLOW}⚠${NC} Could not create label: ${name} (${errors})"
         fi
     done
 }
@@ -97,6 +186,97 @@ setup_branch_protection() {
         echo -e "  ${YELLOW}⚠${NC} Branch protection might already be configured"
 }
 
+# Function to space content-creating requests CREATE_DELAY seconds apart
+pace_create() {
+    if [ "$CREATE_SENT" = true ]; then
+        sleep "$CREATE_DELAY"
+    fi
+    CREATE_SENT=true
+}
+
+# Function to run a gh command, backing off with jitter on secondary rate limits
+# ("was submitted too quickly"); other failures are returned immediately
+gh_retry() {
+    local attempt=1
+    local delay=2
+    local errors output
+    
+    errors=$(mktemp)
+    while true; do
+        if output=$(gh "$@" 2>"$errors"); then
+            rm -f "$errors"
+            [ -z "$output" ] || echo "$output"
+            return 0
+        fi
+        
+        if [ "$attempt" -ge "$MAX_ATTEMPTS" ] || \
+            ! grep -qiE 'submitted too quickly|secondary rate limit|abuse' "$errors"; then
+            cat "$errors" >&2
+            rm -f "$errors"
+            return 1
+        fi
+        
+        sleep $((delay + RANDOM % delay))
+        attempt=$((attempt + 1))
+        delay=$((delay * 2))
+    done
+}
+
+# Function to load existing issue titles for a repository into the cache
+# Every page is revalidated with its own ETag, so an unchanged page costs a
+# 304 that does not count against the rate limit. Leaves an .incomplete
+# marker when any page could not be listed.
+load_existing_issues() {
+    local repo=$1
+    local cache="${CACHE_DIR}/issues-${repo}"
+    local page=1
+    local unchanged=true
+    local etag response status
+    
+    mkdir -p "$CACHE_DIR"
+    : > "${cache}.titles"
+    rm -f "${cache}.incomplete"
+    
+    while true; do
+        # An ETag without its titles would turn a 304 into an empty page
+        [ -f "${cache}.p${page}.titles" ] || rm -f "${cache}.p${page}.etag"
+        etag=""
+        [ -f "${cache}.p${page}.etag" ] && etag=$(cat "${cache}.p${page}.etag")
+        
+        # gh exits non-zero on 304, so inspect the status line instead
+        response=$(gh api -i \
+            -H "If-None-Match: ${etag}" \
+            "/repos/${GITHUB_ORG}/${repo}/issues?state=all&per_page=100&page=${page}" \
+            --jq '.[].title' 2>/dev/null || true)
+        status=$(head -n 1 <<< "$response" | awk '{print $2}')
+        
+        case "$status" in
+            200)
+                unchanged=false
+                awk '/^\r?$/ { exit } tolower($0) ~ /^etag:/ { sub(/^[^:]*: */, ""); sub(/\r$/, ""); print }' \
+                    <<< "$response" > "${cache}.p${page}.etag"
+                awk 'body && NF { print } /^\r?$/ { body = 1 }' <<< "$response" > "${cache}.p${page}.titles"
+                ;;
+            304)
+                ;;
+            *)
+                echo -e "  ${YELLOW}⚠${NC} Could not list issues for ${repo}, checking each ticket on GitHub"
+                touch "${cache}.incomplete"
+                return
+                ;;
+        esac
+        
+        cat "${cache}.p${page}.titles" >> "${cache}.titles"
+        
+        # A short page is the last one
+        [ "$(wc -l < "${cache}.p${page}.titles")" -ge 100 ] || break
+        page=$((page + 1))
+    done
+    
+    [ "$unchanged" = true ] && echo -e "  Issue list for ${repo} unchanged (cached)"
+    return 0
+}
+
 # Function to create issues from ticket files
 create_issues_from_tickets() {
     local service=$1
@@ -114,6 +294,7 @@ create_issues_from_tickets() {
     local ticket_id=""
     local ticket_title=""
     local ticket_body=""
+    local ticket_lines=()
     local ticket_labels=""
     
     while IFS= read -r line; do
@@ -121,19 +302,20 @@ create_issues_from_tickets() {
         if [[ $line =~ ^##[[:space:]]+(PE-[A-Z]+-[0-9]+):[[:space:]](.+) ]]; then
             # If we have a previous ticket, create it
             if [ -n "$ticket_id" ]; then
+                printf -v ticket_body '%s\n' "${ticket_lines[@]}"
                 create_single_issue "$service" "$ticket_id" "$ticket_title" "$ticket_body" "$ticket_labels"
             fi
             
             # Start new ticket
             ticket_id="${BASH_REMATCH[1]}"
             ticket_title="${BASH_REMATCH[2]}"
-            ticket_body=""
+            ticket_lines=()
             ticket_labels="phase:1,service:${service}"
             in_ticket=true
             
         elif [ "$in_ticket" = true ]; then
-            # Add to ticket body
-            ticket_body="${ticket_body}${line}\n"
+            # Collect body lines; they are joined once when the ticket is created
+            ticket_lines+=("$line")
             
             # Extract priority if present
             if [[ $line =~ Priority:[[:space:]]*(Critical|High|Medium|Low) ]]; then
@@ -151,6 +333,7 @@ create_issues_from_tickets() {
     
     # Create the last ticket
     if [ -n "$ticket_id" ]; then
+        printf -v ticket_body '%s\n' "${ticket_lines[@]}"
         create_single_issue "$service" "$ticket_id" "$ticket_title" "$ticket_body" "$ticket_labels"
     fi
 }
@@ -166,19 +349,29 @@ create_single_issue() {
     # Determine repository based on service
     local repo="plasma-engine-${service}"
     
-    # Check if issue already exists
-    if gh issue list -R "${GITHUB_ORG}/${repo}" --search "${id}" | grep -q "${id}"; then
+    local titles="${CACHE_DIR}/issues-${repo}.titles"
+    
+    # Check if issue already exists, asking GitHub directly when the cached
+    # listing is incomplete
+    if [ ! -f "${CACHE_DIR}/issues-${repo}.incomplete" ]; then
+        if grep -qF "[${id}]" "$titles"; then
+            echo -e "  ${YELLOW}Issue ${id} already exists${NC}"
+            return
+        fi
+    elif gh issue list -R "${GITHUB_ORG}/${repo}" --state all --search "${id}" | grep -qF "[${id}]"; then
         echo -e "  ${YELLOW}Issue ${id} already exists${NC}"
         return
     fi
     
     # Create the issue
     echo -e "  Creating issue ${id}: ${title}"
-    echo -e "$body" | gh issue create \
+    pace_create
+    gh_retry issue create \
         --title "[${id}] ${title}" \
-        --body-file - \
+        --body "${body}" \
         --label "${labels}" \
-        -R "${GITHUB_ORG}/${repo}" 2>/dev/null && \
+        -R "${GITHUB_ORG}/${repo}" > /dev/null 2>&1 && \
+        echo "[${id}] ${title}" >> "$titles" && \
         echo -e "  ${GREEN}✓${NC} Created issue ${id}" || \
         echo -e "  ${RED}✗${NC} Failed to create issue ${id}"
 }
@@ -304,18 +497,46 @@ setup_organization_settings() {
         echo -e "  ${YELLOW}⚠${NC} Some settings might require owner permissions"
 }
 
+# Function to run a setup function for each repository concurrently
+# Each repository's output is printed, in order, as soon as its job finishes
+run_per_repo() {
+    local fn=$1
+    shift
+    local logs repo i
+    local pids=()
+    
+    logs=$(mktemp -d)
+    for repo in "$@"; do
+        while [ "$(jobs -rp | wc -l)" -ge "$MAX_JOBS" ]; do
+            sleep 0.1
+        done
+        "$fn" "$repo" > "${logs}/${repo}.log" 2>&1 &
+        pids+=($!)
+    done
+    
+    i=0
+    for repo in "$@"; do
+        wait "${pids[$i]}" || true
+        cat "${logs}/${repo}.log"
+        i=$((i + 1))
+    done
+    rm -rf "$logs"
+}
+
 # Main execution
 echo -e "\n${CYAN}Step 1: Creating Standard Labels${NC}"
+# Labels are content-creating requests, so repositories are handled serially
 for repo in plasma-engine-{gateway,research,brand,content,agent,shared,infra,org}; do
     create_labels "$repo"
 done
 
 echo -e "\n${CYAN}Step 2: Setting Up Branch Protection${NC}"
-for repo in plasma-engine-{gateway,research,brand,content,agent,shared,infra,org}; do
-    setup_branch_protection "$repo"
-done
+run_per_repo setup_branch_protection plasma-engine-{gateway,research,brand,content,agent,shared,infra,org}
 
 echo -e "\n${CYAN}Step 3: Creating Phase 1 Issues${NC}"
+# Existing-issue listings are read-only and run concurrently; issues are then
+# created serially so they stay within GitHub's secondary rate limit
+run_per_repo load_existing_issues plasma-engine-{gateway,research,brand,content,agent,infra}
 for service in gateway research brand content agent infra; do
     create_issues_from_tickets "$service"
 done